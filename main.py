@@ -2,28 +2,90 @@
 
 # -*- coding: utf-8 -*-
 
-import math
+import mmap
 import os
+import queue
 import re
+import sys
+import threading
 import time
-import ujson as json
 import unicodedata
 import warnings
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from shutil import rmtree
 
-import plotly.graph_objs as go
+import numpy as np
+import orjson
 import plotly.offline as opy
+import requests
 from PyPDF2 import PdfFileReader
-from PyPDF2.utils import PdfReadError
-from pdfminer.pdfdocument import PDFEncryptionError, PDFDocument
-from pdfminer.pdfparser import PDFSyntaxError, PDFParser
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfparser import PDFParser
 from pdfminer.pdftypes import resolve1
 from pdfquery import PDFQuery
 from pdfrw import PdfReader
-from tika import parser
+from requests.adapters import HTTPAdapter
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 warnings.simplefilter('ignore')
 
+PROCESS_WORKERS = min(os.cpu_count() or 1, 8)
+
+CHUNKSIZE = 4
+
+PREFETCH_DEPTH = 4
+
+TIKA_URL = 'http://localhost:9998/meta'
+
+TIKA_WORKERS = 16
+
+MAX_PLOT_POINTS = 5000
+
+LOG_FLUSH_FILES = 16
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+PDF_MAGIC = b'%PDF-'
+
+# readers accept header anywhere in first 1024 bytes (junk may precede it)
+PDF_MAGIC_WINDOW = 1024
+
+# spec puts %%EOF within last 1024 bytes, some writers append junk after it
+TRAILER_WINDOW = 4096
+
+_tika_local = threading.local()
+
+_hyperscan_db = _hyperscan_scratch = None
+
+# timings of regex test depend on engine, so it is shown in label and stored in stats
+REGEX_ENGINE = 're' if hyperscan is None else 'hyperscan'
+
+_PAGE_RE = re.compile(rb'/Type\s*/Page(?:[^s]|$)', re.MULTILINE | re.DOTALL)
+
+_STARTXREF_RE = re.compile(rb'startxref\s+(\d+)')
+
+_XREF_SUBSECTION_RE = re.compile(rb'\s*(\d+)[ \t]+(\d+)[ \t]*(?:\r\n|\r|\n)')
+
+_XREF_ENTRY_RE = re.compile(rb'(\d{10})[ \t](\d{5})[ \t]([nf])')
+
+_OBJ_HEADER_RE = re.compile(rb'\s*(\d+)\s+(\d+)\s+obj')
+
+_ROOT_RE = re.compile(rb'/Root\s+(\d+)\s+(\d+)\s+R')
+
+_PREV_RE = re.compile(rb'/Prev\s+(\d+)')
+
+_PAGES_RE = re.compile(rb'/Pages\s+(\d+)\s+(\d+)\s+R')
+
+_COUNT_RE = re.compile(rb'/Count\s+(\d+)(\s+\d+\s+R)?')
+
+_NESTING_RE = re.compile(rb'<<|>>|\[|\]|\(')
+
 
 class Colors:
     """
@@ -41,14 +103,48 @@ class Colors:
     CYAN = "\033[1;36m"
 
 
+SERIES_META = [
+    ('REGEX', 'regex', 'rgb(205, 12, 24)'),
+    ('PYPDF2', 'pypdf2', 'rgb(22, 96, 167)'),
+    ('PDFRW', 'pdfrw', 'rgb(102, 204, 0)'),
+    ('PDFQUERY', 'pdfquery', 'rgb(178, 102, 255)'),
+    ('TIKA', 'tika', 'rgb(255, 255, 0)'),
+    ('PDFMINER', 'pdfminer', 'rgb(204, 0, 102)'),
+    ('XREF', 'xref', 'rgb(255, 153, 51)'),
+]
+
+
 class StatisticPlot:
-    def __init__(self, regex, pypdf2, pdfrw, pdfquery, tika, pdfminer):
-        self.regex = self._read(regex)
-        self.pypdf2 = self._read(pypdf2)
-        self.pdfrw = self._read(pdfrw)
-        self.pdfquery = self._read(pdfquery)
-        self.tika = self._read(tika)
-        self.pdfminer = self._read(pdfminer)
+    def __init__(self, regex=None, pypdf2=None, pdfrw=None, pdfquery=None, tika=None, pdfminer=None, xref=None):
+        files = {
+            'regex': regex,
+            'pypdf2': pypdf2,
+            'pdfrw': pdfrw,
+            'pdfquery': pdfquery,
+            'tika': tika,
+            'pdfminer': pdfminer,
+            'xref': xref,
+        }
+
+        self._series = {}
+
+        for name, file_obj in files.items():
+            # backends which were not run have no series
+            if file_obj is None:
+                continue
+
+            data = self._read(file_obj)
+
+            xs = np.asarray(list(data.keys()))
+            ys = np.asarray(list(data.values()), dtype=np.float64)
+
+            if len(xs) > MAX_PLOT_POINTS:
+                # evenly spaced sample keeps the shape of series (files are sorted by size)
+                indexes = np.linspace(0, len(xs) - 1, MAX_PLOT_POINTS).astype(np.int64)
+
+                xs, ys = xs[indexes], ys[indexes]
+
+            self._series[name] = xs, ys
 
     def _read(self, file_obj):
         """
@@ -63,7 +159,7 @@ class StatisticPlot:
         Creates final layout with labels for XY axis.
         """
 
-        return go.Layout(
+        return dict(
             title='Python libraries performance with reading PDF and gathering info about the number of pages',
             xaxis=dict(
                 title='filename',
@@ -90,62 +186,27 @@ class StatisticPlot:
         General method to generate Bar plot.
         """
 
-        # make Bar plots
-        regex_data = go.Bar(
-            x=list(self.regex.keys()),
-            y=list(self.regex.values()),
-            name='REGEX',
-        )
-
-        pypdf2_data = go.Bar(
-            x=list(self.pypdf2.keys()),
-            y=list(self.pypdf2.values()),
-            name='PYPDF2',
-        )
-
-        pdfrw_data = go.Bar(
-            x=list(self.pdfrw.keys()),
-            y=list(self.pdfrw.values()),
-            name='PDFRW',
-        )
-
-        pdfquery_data = go.Bar(
-            x=list(self.pdfquery.keys()),
-            y=list(self.pdfquery.values()),
-            name='PDFQUERY',
-        )
-
-        tika_data = go.Bar(
-            x=list(self.tika.keys()),
-            y=list(self.tika.values()),
-            name='TIKA',
-        )
-
-        pdfminer_data = go.Bar(
-            x=list(self.pdfminer.keys()),
-            y=list(self.pdfminer.values()),
-            name='PDFMINER',
-        )
-
+        # make Bar plots (plain dicts, validated traces are slow for many points)
         data = [
-            regex_data,
-            pypdf2_data,
-            pdfrw_data,
-            pdfquery_data,
-            tika_data,
-            pdfminer_data
+            dict(
+                type='bar',
+                x=self._series[key][0],
+                y=self._series[key][1],
+                name=name,
+            ) for name, key, color in SERIES_META if key in self._series
         ]
 
         layout = self._make_layout()
 
-        fig = go.Figure(
+        fig = dict(
             data=data,
             layout=layout
         )
 
         opy.plot(
             fig,
-            filename='./plots/pdfs_performance_bar.html'
+            filename='./plots/pdfs_performance_bar.html',
+            validate=False
         )
 
     def generate_scatter_plot(self):
@@ -153,684 +214,748 @@ class StatisticPlot:
         General method to generate Scatter plot.
         """
 
-        # make Scatter plots
-        regex_data = go.Scatter(
-            x=list(self.regex.keys()),
-            y=list(self.regex.values()),
-            name='REGEX',
-            line=dict(
-                color=('rgb(205, 12, 24)'),
-                width=4
-            )
-        )
-
-        pypdf2_data = go.Scatter(
-            x=list(self.pypdf2.keys()),
-            y=list(self.pypdf2.values()),
-            name='PYPDF2',
-            line=dict(
-                color=('rgb(22, 96, 167)'),
-                width=4
-            )
-        )
-
-        pdfrw_data = go.Scatter(
-            x=list(self.pdfrw.keys()),
-            y=list(self.pdfrw.values()),
-            name='PDFRW',
-            line=dict(
-                color=('rgb(102, 204, 0)'),
-                width=4,
-            )
-        )
-
-        pdfquery_data = go.Scatter(
-            x=list(self.pdfquery.keys()),
-            y=list(self.pdfquery.values()),
-            name='PDFQUERY',
-            line=dict(
-                color=('rgb(178, 102, 255)'),
-                width=4,
-            )
-        )
-
-        tika_data = go.Scatter(
-            x=list(self.tika.keys()),
-            y=list(self.tika.values()),
-            name='TIKA',
-            line=dict(
-                color=('rgb(255, 255, 0)'),
-                width=4,
-            )
-        )
-
-        pdfminer_data = go.Scatter(
-            x=list(self.pdfminer.keys()),
-            y=list(self.pdfminer.values()),
-            name='PDFMINER',
-            line=dict(
-                color=('rgb(204, 0, 102)'),
-                width=4,
-            )
-        )
-
+        # make Scatter plots (plain dicts, validated traces are slow for many points)
         data = [
-            regex_data,
-            pypdf2_data,
-            pdfrw_data,
-            pdfquery_data,
-            tika_data,
-            pdfminer_data
+            dict(
+                type='scatter',
+                x=self._series[key][0],
+                y=self._series[key][1],
+                name=name,
+                line=dict(
+                    color=color,
+                    width=4
+                )
+            ) for name, key, color in SERIES_META if key in self._series
         ]
 
         layout = self._make_layout()
 
-        fig = go.Figure(
+        fig = dict(
             data=data,
             layout=layout
         )
 
         opy.plot(
             fig,
-            filename='./plots/pdfs_performance_scatter.html'
+            filename='./plots/pdfs_performance_scatter.html',
+            validate=False
         )
 
 
-class LibrariesTesting:
-    def __init__(self, path):
-        self.path = path
-        self.pdfs = self._prepare_pdfs()
-        self.pdfs_processing_dir = './pdfs_processing_time'
-        self.json_path = './processing_stats'
-        self.plots_path = './plots'
-        self.default_time = '{:0.5f}'.format(0)
-        self.final_stats_dict = {}
-        self.single_file_stats = {}
-        self.tika_url = 'http://localhost:9998/tika'
-        self.is_ready = False
-        self.decimal_round = '{0:.10f}'
+class _Prefetcher:
+    """
+    Warms page cache for upcoming PDFs in a background thread, staying at most depth files ahead.
+    """
 
-    @staticmethod
-    def strip_accents(text):
-        return ''.join(char for char in unicodedata.normalize('NFKD', text) if unicodedata.category(char) != 'Mn')
+    def __init__(self, pdfs, depth):
+        self.pdfs = pdfs
+        self.slots = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
 
-    def _cleanup(self):
+    def __enter__(self):
+        self.thread.start()
+
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def consumed(self):
         """
-        Removes old dirs.
+        Marks next PDF as processed, letting prefetcher move one file ahead.
         """
 
-        if os.path.exists(self.pdfs_processing_dir):
-            rmtree(self.pdfs_processing_dir)
+        self.slots.get()
 
-        if os.path.exists(self.json_path):
-            rmtree(self.json_path)
+    def _run(self):
+        for pdf_file in self.pdfs:
+            while not self.stopped.is_set():
+                try:
+                    self.slots.put(pdf_file, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                return
 
-        if os.path.exists(self.plots_path):
-            rmtree(self.plots_path)
+            self._warm(pdf_file)
 
-    def _prepare_pdfs(self):
+    @staticmethod
+    def _warm(pdf_file):
         """
-        General method to find recursively PDFs.
+        Asks OS to read file into page cache (reads it through where posix_fadvise is missing).
         """
 
-        return sorted(
-            list(
-                set(
-                    [os.path.join(r, f) for r, dirs, fs in os.walk(self.path) for f in fs if
-                     f.endswith('.pdf') and os.path.getsize(os.path.join(r, f)) > 0]
-                )
-            ),
-            key=os.path.getsize,
-            reverse=True
+        try:
+            fd = os.open(pdf_file, os.O_RDONLY)
+        except OSError:
+            return
+
+        try:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                while os.read(fd, 1 << 20):
+                    pass
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _hyperscan_database():
+    """
+    Returns Hyperscan database for page objects and its scratch space, both created once per process.
+    """
+
+    global _hyperscan_db, _hyperscan_scratch
+
+    if _hyperscan_db is None:
+        _hyperscan_db = hyperscan.Database()
+        _hyperscan_db.compile(
+            expressions=[rb'/Type\s*/Page([^s]|\z)'],
+            flags=[hyperscan.HS_FLAG_DOTALL | hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SOM_LEFTMOST]
         )
 
-    def _create_dirs(self):
-        """
-        Creates output directories for processed data.
-        """
+        _hyperscan_scratch = hyperscan.Scratch(_hyperscan_db)
 
-        try:
-            if not os.path.exists(self.pdfs_processing_dir):
-                os.makedirs(self.pdfs_processing_dir)
+    return _hyperscan_db, _hyperscan_scratch
 
-            if not os.path.exists(self.json_path):
-                os.makedirs(self.json_path)
 
-            if not os.path.exists(self.plots_path):
-                os.makedirs(self.plots_path)
+def _regex_pages(pdf_data):
+    """
+    Counts page objects in raw PDF data, using Hyperscan if available.
+    """
 
-        except OSError:
-            raise ('Problem with creating new directories!')
+    if hyperscan is not None:
+        database, scratch = _hyperscan_database()
 
-    def _save_final_stats(self):
-        """
-        Returns finals stats for processed files.
-        """
+        # [count, end of last counted match]
+        matches = [0, 0]
 
-        self.is_ready = True
+        # Hyperscan reports overlapping matches, skipping them keeps re.finditer semantics
+        def on_match(pattern_id, start, end, flags, context):
+            if start >= matches[1]:
+                matches[0] += 1
+                matches[1] = end
 
-        save_path = '{processing_stats_dir}/final_stats.json'.format(
-            processing_stats_dir=self.json_path
+        database.scan(
+            pdf_data,
+            match_event_handler=on_match,
+            scratch=scratch
         )
 
-        with open(save_path, 'w') as f:
-            json.dump(
-                self.final_stats_dict,
-                f,
-                sort_keys=True,
-                indent=4,
-                ensure_ascii=False
-            )
+        return matches[0]
 
-    def _save_mining_time(self, item, test_type):
-        """
-        Stores in file time of processing pdf item.
-        """
+    return sum(1 for _ in _PAGE_RE.finditer(pdf_data))
 
-        self.mining_time_filename = '{test_type}.txt'.format(
-            test_type=test_type
-        )
 
-        save_path = './{processing_dir}/{filename}'.format(
-            processing_dir=self.pdfs_processing_dir,
-            filename=self.mining_time_filename
+def _pypdf2_pages(f):
+    """
+    Counts pages using PyPDF2.
+    Source: https://pythonhosted.org/PyPDF2/
+    """
+
+    reader = PdfFileReader(f, strict=False, overwriteWarnings=False)
+
+    # getNumPages flattens whole page tree of unencrypted files, /Count of root /Pages is enough
+    if reader.isEncrypted:
+        return reader.getNumPages()
+
+    return int(reader.trailer['/Root']['/Pages']['/Count'])
+
+
+def _pdfrw_pages(f):
+    """
+    Counts pages using pdfrw.
+    Source: https://github.com/pmaupin/pdfrw
+    """
+
+    return PdfReader(f).numPages
+
+
+def _pdfquery_pages(f):
+    """
+    Counts pages using pdfquery.
+    Source: https://github.com/jcushman/pdfquery
+    """
+
+    pages = resolve1(PDFQuery(f).doc.catalog['Pages'])
+
+    return resolve1(pages['Count'])
+
+
+def _tika_session():
+    """
+    Returns requests session bound to the current thread (keeps connections to Tika alive).
+    """
+
+    session = getattr(_tika_local, 'session', None)
+
+    if session is None:
+        adapter = HTTPAdapter(
+            pool_connections=TIKA_WORKERS,
+            pool_maxsize=TIKA_WORKERS
         )
 
-        with open(save_path, 'a') as f:
-            f.write('{item1};{item2}\n'.format(
-                item1=item[0],
-                item2=item[1]
-            ))
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
 
-    def _test_regex(self):
-        """
-        Test 1 - Using regex.
-        """
+        _tika_local.session = session
 
-        _regex_pattern = re.compile(
-            b"/Type\s*/Page([^s]|$)",
-            re.MULTILINE | re.DOTALL
+    return session
+
+
+def _tika_pages(pdf_data):
+    """
+    Counts pages using Apache Tika server.
+    """
+
+    # memoryview is sent with single sendall, file-like objects are streamed in 8 KiB reads
+    with memoryview(pdf_data) as body:
+        response = _tika_session().put(
+            TIKA_URL,
+            data=body,
+            headers={'Accept': 'application/json'}
         )
 
-        total_pages, errors, total_mining_time = [], [], []
+    response.raise_for_status()
 
-        for index, pdf_file in enumerate(self.pdfs):
-            index = index + 1
+    return int(response.json().get('xmpTPg:NPages') or 0)
 
-            filename = LibrariesTesting.strip_accents(os.path.basename(pdf_file))
 
-            file_size = self.convert_size(self.get_file_size(pdf_file))
+def _pdfminer_pages(f):
+    """
+    Counts pages using PDFMiner.
+    """
 
-            try:
-                start_time = time.time()
+    parser = PDFParser(f)
 
-                with open(pdf_file, 'rb') as f:
-                    _pdf_data = f.read()
+    doc = PDFDocument(parser)
+    parser.set_document(doc)
 
-                    pages_count = len(_regex_pattern.findall(_pdf_data))
+    # resolves only top /Pages dictionary (and /Count if indirect), not the page tree
+    pages = resolve1(doc.catalog['Pages'])
 
-                    end_time = time.time()
+    return resolve1(pages.get('Count', 0))
 
-                    single_file_time = self.decimal_round.format(end_time - start_time)
 
-                    total_mining_time.append(single_file_time)
+def _xref_trailer(data, pos):
+    """
+    Returns trailer dictionary following xref table which starts before pos.
+    """
 
-                    mining_time = filename, single_file_time
+    start = data.find(b'trailer', pos)
 
-                    self._save_mining_time(
-                        item=mining_time,
-                        test_type='regex'
-                    )
+    if start == -1:
+        raise ValueError('Trailer not found')
 
-                    total_pages.append(pages_count)
+    end = data.find(b'startxref', start)
 
-                    print(
-                        Colors.OKBLUE + '[REGEX] File {i}/{index}. Total pages: {pages_count} --> "{filename}" - {file_size}'.format(
-                            i=index,
-                            index=len(self.pdfs),
-                            pages_count=pages_count,
-                            filename=filename,
-                            file_size=file_size
-                        ) + Colors.ENDC
-                    )
-            except (KeyError, AttributeError) as error:
-                self._save_mining_time(
-                    item=(filename, self.default_time),
-                    test_type='regex'
-                )
+    return data[start:end if end != -1 else start + 4096]
 
-                errors.append(error)
-                pass
 
-        total_pages, total_errors = list(map(int, total_pages)), len(errors)
+def _xref_object_offset(data, xref_offset, obj_num):
+    """
+    Returns offset of object looking it up in classic xref tables (following /Prev).
+    """
 
-        regex_total_pages = sum(total_pages)
+    visited = set()
 
-        print(
-            Colors.OKBLUE + '[REGEX] Total pages count: {regex_total_pages}'.format(
-                regex_total_pages=regex_total_pages
-            ) + Colors.ENDC
-        )
+    while xref_offset not in visited:
+        visited.add(xref_offset)
 
-        list_set_errors, total_parsing_time = list(set(errors)), sum(list(map(float, total_mining_time)))
+        if data[xref_offset:xref_offset + 4] != b'xref':
+            raise ValueError('No xref table at {offset}'.format(offset=xref_offset))
 
-        self.final_stats_dict.update(**{
-            'regex_total_pages': regex_total_pages,
-            'regex_total_parsing_time': total_parsing_time,
-            'regex_errors': {
-                'count': total_errors,
-                'errors': list_set_errors
-            },
-        })
+        pos = xref_offset + 4
 
-    def _test_pypdf2(self):
-        """
-        Test 2 - Using PyPDF2.
-        Source: https://pythonhosted.org/PyPDF2/
-        """
+        subsection = _XREF_SUBSECTION_RE.match(data, pos)
 
-        print(Colors.UNDERLINE + '________________________________________________\n' + Colors.ENDC)
+        while subsection is not None:
+            first, count = int(subsection.group(1)), int(subsection.group(2))
 
-        total_pages, errors, total_mining_time = [], [], []
+            pos = subsection.end()
 
-        for index, pdf_file in enumerate(self.pdfs):
-            index = index + 1
+            if first <= obj_num < first + count:
+                entry = _XREF_ENTRY_RE.match(data, pos + 20 * (obj_num - first))
 
-            filename = LibrariesTesting.strip_accents(os.path.basename(pdf_file))
+                if entry is None or entry.group(3) != b'n':
+                    raise ValueError('Bad xref entry for object {obj_num}'.format(obj_num=obj_num))
 
-            file_size = self.convert_size(self.get_file_size(pdf_file))
+                return int(entry.group(1))
 
-            try:
-                start_time = time.time()
+            pos += 20 * count
 
-                with open(pdf_file, 'rb') as f:
-                    reader = PdfFileReader(f)
+            subsection = _XREF_SUBSECTION_RE.match(data, pos)
 
-                    pages_count = reader.getNumPages()
+        prev = _PREV_RE.search(_xref_trailer(data, pos))
 
-                    end_time = time.time()
+        if prev is None:
+            break
 
-                    single_file_time = self.decimal_round.format(end_time - start_time)
+        xref_offset = int(prev.group(1))
 
-                    total_mining_time.append(single_file_time)
+    raise ValueError('Object {obj_num} not found in xref'.format(obj_num=obj_num))
 
-                    mining_time = filename, single_file_time
 
-                    self._save_mining_time(
-                        item=mining_time,
-                        test_type='pypdf2'
-                    )
+def _xref_object(data, xref_offset, obj_num):
+    """
+    Returns raw body of indirect object.
+    """
 
-                    total_pages.append(pages_count)
+    offset = _xref_object_offset(data, xref_offset, obj_num)
 
-                    print(
-                        Colors.OKGREEN + '[PyPDF2] File {i}/{index}. Total pages: {pages_count} --> "{filename}" - {file_size}'.format(
-                            i=index,
-                            index=len(self.pdfs),
-                            pages_count=pages_count,
-                            filename=filename,
-                            file_size=file_size
-                        ) + Colors.ENDC
-                    )
-            except PdfReadError as error:
-                self._save_mining_time(
-                    item=(filename, self.default_time),
-                    test_type='pypdf2'
-                )
+    header = _OBJ_HEADER_RE.match(data, offset)
 
-                errors.append(error)
-                pass
+    if header is None or int(header.group(1)) != obj_num:
+        raise ValueError('Object {obj_num} not found at {offset}'.format(obj_num=obj_num, offset=offset))
 
-        total_pages, total_errors = list(map(int, total_pages)), len(errors)
+    end = data.find(b'endobj', header.end())
 
-        list_set_errors, total_parsing_time = list(set(errors)), sum(list(map(float, total_mining_time)))
+    if end == -1:
+        raise ValueError('Object {obj_num} is not terminated'.format(obj_num=obj_num))
 
-        pypdf2_total_pages = sum(total_pages)
+    return data[header.end():end]
 
-        print(
-            Colors.OKGREEN + '[PyPDF2] Total pages count: {pypdf2_total_pages}'.format(
-                pypdf2_total_pages=pypdf2_total_pages
-            ) + Colors.ENDC
-        )
 
-        self.final_stats_dict.update(**{
-            'pypdf2_total_pages': pypdf2_total_pages,
-            'pypdf2_total_parsing_time': total_parsing_time,
-            'pypdf2_errors': {
-                'count': total_errors,
-                'errors': list_set_errors
-            },
-        })
+def _dict_entry(pattern, body):
+    """
+    Returns match of pattern among top-level entries of dictionary in body (nested dictionaries and arrays skipped).
+    """
 
-    def _test_pdfrw(self):
-        """
-        Test 3 - Using pdfrw.
-        Source: https://github.com/pmaupin/pdfrw
-        """
+    for match in pattern.finditer(body):
+        depth = 0
 
-        print(Colors.UNDERLINE + '________________________________________________\n' + Colors.ENDC)
+        for token in _NESTING_RE.findall(body, 0, match.start()):
+            # strings may hide delimiters, they are left for full parsers
+            if token == b'(':
+                raise ValueError('String before dictionary entry')
 
-        total_pages, errors, total_mining_time = [], [], []
+            depth += 1 if token in (b'<<', b'[') else -1
 
-        for index, pdf_file in enumerate(self.pdfs):
-            index = index + 1
+        if depth == 1:
+            return match
 
-            filename = LibrariesTesting.strip_accents(os.path.basename(pdf_file))
+    return None
 
-            file_size = self.convert_size(self.get_file_size(pdf_file))
 
-            try:
-                start_time = time.time()
+def _xref_pages_count(data):
+    """
+    Reads /Root -> /Pages -> /Count touching only xref, trailer and two (or three) objects.
+    """
 
-                with open(pdf_file, 'rb') as f:
-                    reader = PdfReader(f)
+    # startxref precedes %%EOF at the very end, so only the tail is searched (not whole file)
+    position = data.rfind(b'startxref', max(len(data) - TRAILER_WINDOW, 0))
 
-                    pages_count = reader.numPages
+    startxref = _STARTXREF_RE.match(data, position) if position != -1 else None
 
-                    end_time = time.time()
+    if startxref is None:
+        raise ValueError('startxref not found')
 
-                    single_file_time = self.decimal_round.format(end_time - start_time)
+    xref_offset = int(startxref.group(1))
 
-                    total_mining_time.append(single_file_time)
+    root = _dict_entry(_ROOT_RE, _xref_trailer(data, xref_offset))
 
-                    mining_time = filename, single_file_time
+    if root is None:
+        raise ValueError('Trailer has no /Root')
 
-                    self._save_mining_time(
-                        item=mining_time,
-                        test_type='pdfrw'
-                    )
+    pages = _dict_entry(_PAGES_RE, _xref_object(data, xref_offset, int(root.group(1))))
 
-                    total_pages.append(pages_count)
+    if pages is None:
+        raise ValueError('Catalog has no /Pages')
 
-                    print(
-                        Colors.BOLD + '[PDFRW] File {i}/{index}. Total pages: {pages_count} --> "{filename}" - {file_size}'.format(
-                            i=index,
-                            index=len(self.pdfs),
-                            pages_count=pages_count,
-                            filename=filename,
-                            file_size=file_size
-                        ) + Colors.ENDC
-                    )
-            except (ValueError, PdfReadError) as error:
-                self._save_mining_time(
-                    item=(filename, self.default_time),
-                    test_type='pdfrw'
-                )
+    count = _dict_entry(_COUNT_RE, _xref_object(data, xref_offset, int(pages.group(1))))
 
-                errors.append(error)
-                pass
+    if count is None:
+        raise ValueError('Pages have no /Count')
 
-        total_pages, total_errors = list(map(int, total_pages)), len(errors)
+    # /Count may be indirect reference to integer object
+    if count.group(2) is not None:
+        return int(_xref_object(data, xref_offset, int(count.group(1))).strip())
 
-        list_set_errors, total_parsing_time = list(set(errors)), sum(list(map(float, total_mining_time)))
+    return int(count.group(1))
 
-        pdfrw_total_pages = sum(total_pages)
 
-        print(
-            Colors.BOLD + '[PDFRW] Total pages count: {pdfrw_total_pages}'.format(
-                pdfrw_total_pages=pdfrw_total_pages
-            ) + Colors.ENDC
-        )
+def _fast_page_count(pdf_data):
+    """
+    Counts pages walking xref table directly, falling back to pdfrw (e.g. for xref streams).
+    """
 
-        self.final_stats_dict.update(**{
-            'pdfrw_total_pages': pdfrw_total_pages,
-            'pdfrw_total_parsing_time': total_parsing_time,
-            'pdfrw_errors': {
-                'count': total_errors,
-                'errors': list_set_errors
-            },
-        })
+    try:
+        return _xref_pages_count(pdf_data)
+    except ValueError:
+        pass
 
-    def _test_pdfquery(self):
-        """
-        Test 4 - Using pdfquery.
-        Source: https://github.com/jcushman/pdfquery
-        """
+    pdf_data.seek(0)
+
+    return PdfReader(pdf_data, decompress=False, verbose=False).numPages
 
-        print(Colors.UNDERLINE + '________________________________________________\n' + Colors.ENDC)
 
-        total_pages, errors, total_mining_time = [], [], []
+def _measure_file(extracts, pdf_file):
+    """
+    Maps a single PDF once and times counting its pages with each of extracts.
+    Returns filename and (time, pages, error) for every extract, error is repr of whatever it raised.
+    """
 
-        for index, pdf_file in enumerate(self.pdfs):
-            index = index + 1
+    filename = LibrariesTesting.strip_accents(os.path.basename(pdf_file))
 
-            filename = LibrariesTesting.strip_accents(os.path.basename(pdf_file))
+    results = []
 
-            file_size = self.convert_size(self.get_file_size(pdf_file))
+    # locals skip attribute lookups in per-test loop (it runs tests x files times)
+    append, _now = results.append, time.perf_counter
+
+    with open(pdf_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as pdf_data:
+        # not PDF at all - fail every test at once rather than letting libraries raise
+        if pdf_data.find(PDF_MAGIC, 0, PDF_MAGIC_WINDOW) == -1:
+            return filename, [(None, None, repr(ValueError('PDF header not found')))] * len(extracts)
+
+        rewind = pdf_data.seek
+
+        for extract in extracts:
+            rewind(0)
 
             try:
-                start_time = time.time()
+                start_time = _now()
 
-                with open(pdf_file, 'rb') as f:
-                    reader = PDFQuery(f)
+                pages_count = extract(pdf_data)
 
-                    pages_count = reader.doc.catalog['Pages'].resolve()['Count']
+                append((_now() - start_time, pages_count, None))
+            # one broken file must not abort the run (nor other tests), whatever library raises;
+            # repr keeps errors picklable on the way back from process workers
+            except Exception as error:
+                append((None, None, repr(error)))
 
-                    end_time = time.time()
+    return filename, results
 
-                    single_file_time = self.decimal_round.format(end_time - start_time)
 
-                    total_mining_time.append(single_file_time)
+def _scan_pdfs(path):
+    """
+    Yields (size, path) of non-empty PDFs found recursively (symlinked dirs are not followed, like os.walk).
+    """
 
-                    mining_time = filename, single_file_time
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return
 
-                    self._save_mining_time(
-                        item=mining_time,
-                        test_type='pdfquery'
-                    )
+    with entries:
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    yield from _scan_pdfs(entry.path)
 
-                    total_pages.append(pages_count)
+                continue
 
-                    print(
-                        Colors.FAIL + '[PDFQUERY] File {i}/{index}. Total pages: {pages_count} --> "{filename}" - {file_size}'.format(
-                            i=index,
-                            index=len(self.pdfs),
-                            pages_count=pages_count,
-                            filename=filename,
-                            file_size=file_size
-                        ) + Colors.ENDC
-                    )
-            except (KeyError, AttributeError, TypeError, PDFSyntaxError, PDFEncryptionError) as error:
-                self._save_mining_time(
-                    item=(filename, self.default_time),
-                    test_type='pdfquery'
-                )
+            if not entry.name.endswith('.pdf'):
+                continue
 
-                errors.append(error)
-                pass
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
 
-        total_pages, total_errors = list(map(int, total_pages)), len(errors)
+            if size > 0:
+                yield size, entry.path
 
-        list_set_errors, total_parsing_time = list(set(errors)), sum(list(map(float, total_mining_time)))
 
-        pdfquery_total_pages = sum(total_pages)
+# extract gets read-only mmap of PDF (file-like object supporting buffer protocol),
+# anything it raises is recorded as error of the file, max_workers None means PROCESS_WORKERS
+PageCountTest = namedtuple(
+    'PageCountTest',
+    ['name', 'label', 'extract', 'color', 'executor_class', 'max_workers']
+)
 
-        print(
-            Colors.FAIL + '[PDFQUERY] Total pages count: {pdfquery_total_pages}'.format(
-                pdfquery_total_pages=pdfquery_total_pages
-            ) + Colors.ENDC
-        )
+# only Tika (waiting on HTTP) runs in threads, the rest parse in pure Python and would serialize on GIL
+TESTS = [
+    PageCountTest('regex', 'REGEX ({engine})'.format(engine=REGEX_ENGINE), _regex_pages, Colors.OKBLUE, ProcessPoolExecutor, None),
+    PageCountTest('pypdf2', 'PyPDF2', _pypdf2_pages, Colors.OKGREEN, ProcessPoolExecutor, None),
+    PageCountTest('pdfrw', 'PDFRW', _pdfrw_pages, Colors.BOLD, ProcessPoolExecutor, None),
+    PageCountTest('pdfquery', 'PDFQUERY', _pdfquery_pages, Colors.FAIL, ProcessPoolExecutor, None),
+    PageCountTest('tika', 'APACHE TIKA', _tika_pages, Colors.HEADER, ThreadPoolExecutor, TIKA_WORKERS),
+    PageCountTest('pdfminer', 'PDFMINER', _pdfminer_pages, Colors.CYAN, ProcessPoolExecutor, None),
+    PageCountTest('xref', 'XREF', _fast_page_count, Colors.WARNING, ProcessPoolExecutor, None),
+]
 
-        self.final_stats_dict.update(**{
-            'pdfquery_total_pages': pdfquery_total_pages,
-            'pdfquery_total_parsing_time': total_parsing_time,
-            'pdfquery_errors': {
-                'count': total_errors,
-                'errors': list_set_errors
-            },
-        })
+# tests touching only trailer, xref and few objects - prefetching whole files would only add I/O for them
+TRAILER_ONLY_TESTS = frozenset(['xref'])
 
-    def _test_tika(self):
-        """
-        Test 5 - Using tika.
-        """
 
-        print(Colors.UNDERLINE + '________________________________________________\n' + Colors.ENDC)
+class LibrariesTesting:
+    def __init__(self, path, backends=None):
+        self.path = path
 
-        total_pages, errors, total_mining_time = [], [], []
+        # all tests run by default, backends (TESTS names) pick subset of them
+        if backends is not None:
+            unknown = set(backends) - {test.name for test in TESTS}
 
-        for index, pdf_file in enumerate(self.pdfs):
-            index = index + 1
+            if unknown:
+                raise ValueError('Unknown backends: {backends}'.format(backends=', '.join(sorted(unknown))))
 
-            filename = LibrariesTesting.strip_accents(os.path.basename(pdf_file))
+        self.tests = [test for test in TESTS if backends is None or test.name in backends]
+        self.backends = [test.name for test in self.tests]
+        self.pdfs, self._file_sizes = [], {}
 
-            file_size = self.convert_size(self.get_file_size(pdf_file))
+        for pdf_file, size in self._prepare_pdfs():
+            self.pdfs.append(pdf_file)
+            self._file_sizes[pdf_file] = size, self.convert_size(size)
 
-            try:
-                start_time = time.time()
+        self.pdfs_processing_dir = './pdfs_processing_time'
+        self.json_path = './processing_stats'
+        self.plots_path = './plots'
+        self.default_time = 0.0
+        self.final_stats_dict = {}
+        self._mining_rows = defaultdict(list)
+        self._log_buf = []
+        self.single_file_stats = {}
+        self.decimal_round = '{0:.10f}'
 
-                with open(pdf_file, 'rb') as f:
-                    reader = parser.from_buffer(
-                        string=f.read(),
-                        serverEndpoint=self.tika_url
-                    )
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def strip_accents(text):
+        if text.isascii():
+            return text
 
-                    pages_count = reader.get('metadata').get('xmpTPg:NPages', 0)
+        return ''.join(char for char in unicodedata.normalize('NFKD', text) if unicodedata.category(char) != 'Mn')
 
-                    end_time = time.time()
+    def _cleanup(self):
+        """
+        Removes old dirs.
+        """
 
-                    single_file_time = self.decimal_round.format(end_time - start_time)
+        if os.path.exists(self.pdfs_processing_dir):
+            rmtree(self.pdfs_processing_dir)
 
-                    total_mining_time.append(single_file_time)
+        if os.path.exists(self.json_path):
+            rmtree(self.json_path)
 
-                    mining_time = filename, single_file_time
+        if os.path.exists(self.plots_path):
+            rmtree(self.plots_path)
 
-                    self._save_mining_time(
-                        item=mining_time,
-                        test_type='tika'
-                    )
+    def _prepare_pdfs(self):
+        """
+        General method to find recursively PDFs with their sizes (the biggest first).
+        """
 
-                    total_pages.append(pages_count)
+        return [(pdf_file, size) for size, pdf_file in sorted(_scan_pdfs(self.path), reverse=True)]
 
-                    print(
-                        Colors.HEADER + '[APACHE TIKA] File {i}/{index}. Total pages: {pages_count} --> "{filename}" - {file_size}'.format(
-                            i=index,
-                            index=len(self.pdfs),
-                            pages_count=pages_count,
-                            filename=filename,
-                            file_size=file_size
-                        ) + Colors.ENDC
-                    )
-            except (KeyError, AttributeError, TypeError, PDFSyntaxError, PDFEncryptionError) as error:
-                self._save_mining_time(
-                    item=(filename, self.default_time),
-                    test_type='tika'
+    def _create_dirs(self):
+        """
+        Creates output directories for processed data.
+        """
+
+        try:
+            if not os.path.exists(self.pdfs_processing_dir):
+                os.makedirs(self.pdfs_processing_dir)
+
+            if not os.path.exists(self.json_path):
+                os.makedirs(self.json_path)
+
+            if not os.path.exists(self.plots_path):
+                os.makedirs(self.plots_path)
+
+        except OSError:
+            raise ('Problem with creating new directories!')
+
+    def _save_final_stats(self):
+        """
+        Returns finals stats for processed files.
+        """
+
+        save_path = '{processing_stats_dir}/final_stats.json'.format(
+            processing_stats_dir=self.json_path
+        )
+
+        with open(save_path, 'wb') as f:
+            f.write(
+                orjson.dumps(
+                    self.final_stats_dict,
+                    default=repr,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
                 )
+            )
 
-                errors.append(error)
-                pass
+    def _save_mining_time(self, item, test_type):
+        """
+        Buffers time of processing pdf item (written by _flush_mining_rows).
+        """
 
-        total_pages, total_errors = list(map(int, total_pages)), len(errors)
+        self._mining_rows[test_type].append(item)
 
-        list_set_errors, total_parsing_time = list(set(errors)), sum(list(map(float, total_mining_time)))
+    def _flush_mining_rows(self, test_type):
+        """
+        Stores in file buffered times of processing pdf items.
+        """
 
-        tika_total_pages = sum(total_pages)
+        self.mining_time_filename = '{test_type}.txt'.format(
+            test_type=test_type
+        )
 
-        print(
-            Colors.HEADER + '[APACHE TIKA] Total pages count: {tika_total_pages}'.format(
-                tika_total_pages=tika_total_pages
-            ) + Colors.ENDC
+        save_path = './{processing_dir}/{filename}'.format(
+            processing_dir=self.pdfs_processing_dir,
+            filename=self.mining_time_filename
         )
 
-        self.final_stats_dict.update(**{
-            'tika_total_pages': tika_total_pages,
-            'tika_total_parsing_time': total_parsing_time,
-            'tika_errors': {
-                'count': total_errors,
-                'errors': list_set_errors
-            },
-        })
+        rows = ''.join(
+            '{item1};{item2}\n'.format(
+                item1=item[0],
+                item2=self.decimal_round.format(item[1])
+            ) for item in self._mining_rows.pop(test_type, [])
+        )
+
+        with open(save_path, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(rows)
+
+    def _log(self, line):
+        """
+        Buffers console line (printed by _flush_log, every LOG_FLUSH_FILES processed files).
+        """
+
+        self._log_buf.append(line)
 
-    def _test_pdfminer(self):
+    def _flush_log(self):
         """
-        Test 6 - Using PDFMiner.
+        Prints buffered console lines at once.
         """
 
-        print(Colors.UNDERLINE + '________________________________________________\n' + Colors.ENDC)
+        if self._log_buf:
+            sys.stdout.write('\n'.join(self._log_buf) + '\n')
+            sys.stdout.flush()
 
-        total_pages, errors, total_mining_time = [], [], []
+            del self._log_buf[:]
 
-        for index, pdf_file in enumerate(self.pdfs):
-            index = index + 1
+    def _map_pdfs(self, worker, executor_class=ProcessPoolExecutor, max_workers=None, prefetch=True):
+        """
+        Runs worker for each PDF in a pool (of processes by default) and yields results in order.
+        """
 
-            filename = os.path.basename(pdf_file)
+        max_workers = max_workers or PROCESS_WORKERS
 
-            file_size = self.convert_size(self.get_file_size(pdf_file))
+        # pool works on up to max_workers * CHUNKSIZE files ahead of yielded result
+        depth = max_workers * CHUNKSIZE + PREFETCH_DEPTH
 
-            try:
-                start_time = time.time()
+        with executor_class(max_workers=max_workers) as pool:
+            # map submits all files at once, which starts (forks on Linux) process workers,
+            # so they are created before prefetcher thread - forking multi-threaded process may deadlock
+            results = pool.map(worker, self.pdfs, chunksize=CHUNKSIZE)
+
+            if not prefetch:
+                yield from results
+
+                return
+
+            with _Prefetcher(self.pdfs, depth) as prefetcher:
+                for result in results:
+                    prefetcher.consumed()
+
+                    yield result
+
+    def _run_tests(self, tests, executor_class, max_workers):
+        """
+        Runs tests sharing one pool, reading each PDF once for all of them.
+        Prints and buffers results of every file as soon as pool yields it, then stores summary of each test.
+        """
+
+        worker = partial(
+            _measure_file,
+            tuple(test.extract for test in tests)
+        )
 
-                with open(pdf_file, 'rb') as f:
-                    parser = PDFParser(f)
+        total = len(self.pdfs)
 
-                    doc = PDFDocument(parser)
-                    parser.set_document(doc)
+        # failed files keep zeros, so they add nothing to totals (row per test)
+        pages_arr = np.zeros((len(tests), total), dtype=np.int64)
+        time_arr = np.zeros((len(tests), total), dtype=np.float64)
 
-                    pages = resolve1(doc.catalog['Pages'])
-                    pages_count = pages.get('Count', 0)
+        errors = [{} for _ in tests]
+        error_counts = [0] * len(tests)
 
-                    end_time = time.time()
+        prefetch = any(test.name not in TRAILER_ONLY_TESTS for test in tests)
 
-                    single_file_time = self.decimal_round.format(end_time - start_time)
+        results = zip(self.pdfs, self._map_pdfs(worker, executor_class, max_workers, prefetch))
 
-                    total_mining_time.append(single_file_time)
+        start_time = time.perf_counter()
 
-                    mining_time = filename, single_file_time
+        for index, (pdf_file, (filename, file_results)) in enumerate(results):
+            file_size = self._file_sizes[pdf_file][1]
 
+            for test_index, (test, (elapsed, pages_count, error)) in enumerate(zip(tests, file_results)):
+                if error is not None:
                     self._save_mining_time(
-                        item=mining_time,
-                        test_type='pdfminer'
+                        item=(filename, self.default_time),
+                        test_type=test.name
                     )
 
-                    total_pages.append(pages_count)
+                    error_counts[test_index] += 1
+                    errors[test_index].setdefault(error, error)
+                    continue
+
+                pages_arr[test_index, index], time_arr[test_index, index] = pages_count, elapsed
 
-                    print(
-                        Colors.CYAN + '[PDFMINER] File {i}/{index}. Total pages: {pages_count} --> "{filename}" - {file_size}'.format(
-                            i=index,
-                            index=len(self.pdfs),
-                            pages_count=pages_count,
-                            filename=filename,
-                            file_size=file_size
-                        ) + Colors.ENDC
-                    )
-            except (KeyError, AttributeError, PDFSyntaxError, PDFEncryptionError)  as error:
                 self._save_mining_time(
-                    item=(filename, self.default_time),
-                    test_type='pdfminer'
+                    item=(filename, elapsed),
+                    test_type=test.name
                 )
 
-                errors.append(error)
-                pass
+                self._log(
+                    test.color + '[{label}] File {i}/{index}. Total pages: {pages_count} --> "{filename}" - {file_size}'.format(
+                        label=test.label,
+                        i=index + 1,
+                        index=total,
+                        pages_count=pages_count,
+                        filename=filename,
+                        file_size=file_size
+                    ) + Colors.ENDC
+                )
+
+            # progress of all tests in pool goes out at once for every LOG_FLUSH_FILES files
+            if (index + 1) % LOG_FLUSH_FILES == 0:
+                self._flush_log()
+
+        # per-file times of concurrent workers overlap, so their sum is not elapsed time of test
+        wall_time = time.perf_counter() - start_time
 
-        total_pages, total_errors = list(map(int, total_pages)), len(errors)
+        for test_index, test in enumerate(tests):
+            self._log(Colors.UNDERLINE + '________________________________________________\n' + Colors.ENDC)
 
-        list_set_errors, total_parsing_time = list(set(errors)), sum(list(map(float, total_mining_time)))
+            self._record_test(
+                test,
+                int(pages_arr[test_index].sum()),
+                float(time_arr[test_index].sum()),
+                wall_time,
+                list(errors[test_index].values()),
+                error_counts[test_index]
+            )
+
+        self._flush_log()
+
+    def _record_test(self, test, test_total_pages, total_parsing_time, wall_time, list_set_errors, error_count):
+        """
+        Prints and stores summary of single test.
+        """
 
-        pdfminer_total_pages = sum(total_pages)
+        self._flush_mining_rows(test.name)
 
-        print(
-            Colors.CYAN + '[PDFMINER] Total pages count: {pdfminer_total_pages}'.format(
-                pdfminer_total_pages=pdfminer_total_pages
+        self._log(
+            test.color + '[{label}] Total pages count: {test_total_pages}'.format(
+                label=test.label,
+                test_total_pages=test_total_pages
             ) + Colors.ENDC
         )
 
         self.final_stats_dict.update(**{
-            'pdfminer_total_pages': pdfminer_total_pages,
-            'pdfminer_total_parsing_time': total_parsing_time,
-            'pdfminer_errors': {
-                'count': total_errors,
+            '{name}_total_pages'.format(name=test.name): test_total_pages,
+            '{name}_total_parsing_time'.format(name=test.name): total_parsing_time,
+            '{name}_wall_time'.format(name=test.name): wall_time,
+            '{name}_errors'.format(name=test.name): {
+                'count': error_count,
                 'errors': list_set_errors
             },
         })
 
-    @staticmethod
-    def get_file_size(file_path):
-        """
-        Returns file size.
-        """
-
-        return os.stat(file_path).st_size
-
     @staticmethod
     def convert_size(size_bytes):
         """
@@ -849,11 +974,9 @@ class LibrariesTesting:
                 'TB'
             )
 
-            i = int(math.floor(math.log(size_bytes, 1024)))
-
-            p = math.pow(1024, i)
+            i = min((size_bytes.bit_length() - 1) // 10, len(size_name) - 1)
 
-            s = round(size_bytes / p, 2)
+            s = round(size_bytes / (1 << (10 * i)), 2)
 
             return '{filesize} {size_type}'.format(
                 filesize=s,
@@ -869,10 +992,17 @@ class LibrariesTesting:
 
         self._cleanup()
         self._create_dirs()
-        self._test_regex()
-        self._test_pypdf2()
-        self._test_pdfrw()
-        self._test_pdfquery()
-        self._test_tika()
-        self._test_pdfminer()
+
+        # tests sharing executor run together, so each PDF is read once per pool
+        pools = {}
+
+        for test in self.tests:
+            pools.setdefault((test.executor_class, test.max_workers), []).append(test)
+
+        for (executor_class, max_workers), tests in pools.items():
+            self._run_tests(tests, executor_class, max_workers)
+
+        if 'regex' in self.backends:
+            self.final_stats_dict['regex_engine'] = REGEX_ENGINE
+
         self._save_final_stats()
@@ -13,26 +13,21 @@ def run():
     Retrieve the number of pages for each PDF and generate plots.
     """
 
+    # optional backends after path (e.g. pdfrw xref), all of them when omitted
     lib_test = LibrariesTesting(
-        path=sys.argv[1]
+        path=sys.argv[1],
+        backends=sys.argv[2:] or None
     )
 
     lib_test.launch()
 
-    while not lib_test.is_ready:
-        continue
-    else:
-        s = StatisticPlot(
-            regex=os.path.join('./pdfs_processing_time/regex.txt'),
-            pypdf2=os.path.join('./pdfs_processing_time/pypdf2.txt'),
-            pdfrw=os.path.join('./pdfs_processing_time/pdfrw.txt'),
-            pdfquery=os.path.join('./pdfs_processing_time/pdfquery.txt'),
-            tika=os.path.join('./pdfs_processing_time/tika.txt'),
-            pdfminer=os.path.join('./pdfs_processing_time/pdfminer.txt'),
-        )
-
-        s.generate_scatter_plot()
-        s.generate_bar_plot()
+    s = StatisticPlot(**{
+        backend: os.path.join('./pdfs_processing_time/{backend}.txt'.format(backend=backend))
+        for backend in lib_test.backends
+    })
+
+    s.generate_scatter_plot()
+    s.generate_bar_plot()
 
 
 if __name__ == '__main__':